@@ -1,15 +1,104 @@
 """Arelle XBRL Validation API."""
 
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
+
+from .validator import ResultCache, ValidationResult, open_session, validate_xbrl
+
+
+# Number of validation worker processes
+WORKERS = int(os.environ.get("ARELLE_WORKERS", os.cpu_count() or 1))
+
+# Largest request body accepted, in bytes
+MAX_XBRL_BYTES = int(os.environ.get("MAX_XBRL_BYTES", 10 * 1024 * 1024))
+
+# Leading markup accepted as a plausible XBRL instance: an XML declaration or
+# processing instruction, a comment or DOCTYPE, or an xbrl/xbrli:xbrl root
+XBRL_PREFIXES = ("<?", "<!", "<xbrl")
+
+
+def _looks_like_xbrl(body: bytes) -> bool:
+    """Check the start of the body for markup an XBRL instance can begin with.
+
+    Only the first kilobyte is decoded: as UTF-16 when it has a UTF-16 byte
+    order mark or NUL-interleaved ASCII, otherwise as an ASCII-compatible
+    encoding (a UTF-8 BOM is skipped).
+    """
+    head = body[:1024]
+    if head.startswith((b"\xff\xfe", b"\xfe\xff")):
+        text = head.decode("utf-16", errors="ignore")
+    elif head[:1] == b"\x00":
+        text = head.decode("utf-16-be", errors="ignore")
+    elif head[1:2] == b"\x00":
+        text = head.decode("utf-16-le", errors="ignore")
+    else:
+        text = head.decode("utf-8-sig", errors="ignore")
+    return text.lstrip().startswith(XBRL_PREFIXES)
+
+
+async def _start_executor() -> ProcessPoolExecutor:
+    """Start a pool of worker processes, each holding a primed Arelle session.
+
+    Arelle keeps process-wide global state and only one Session may run at a
+    time per process, so validations run in parallel across worker processes.
+    """
+    executor = ProcessPoolExecutor(
+        max_workers=WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=open_session,
+    )
+    loop = asyncio.get_running_loop()
+    # Spawn every worker up front so none is primed on a live request
+    await asyncio.gather(
+        *(loop.run_in_executor(executor, open_session) for _ in range(WORKERS))
+    )
+    return executor
 
-from .validator import validate_xbrl
+
+async def _restart_executor(app: FastAPI, broken: ProcessPoolExecutor) -> None:
+    """Replace a pool left unusable by a dead worker (OOM kill, crash)."""
+    async with app.state.executor_lock:
+        # Another request may already have replaced it
+        if app.state.executor is broken:
+            broken.shutdown(wait=False)
+            app.state.executor = await _start_executor()
+
+
+async def _run_validation(app: FastAPI, body: bytes) -> ValidationResult:
+    """Validate in the worker pool, restarting the pool once if it broke."""
+    loop = asyncio.get_running_loop()
+    executor = app.state.executor
+    try:
+        return await loop.run_in_executor(executor, validate_xbrl, body)
+    except BrokenProcessPool:
+        await _restart_executor(app, executor)
+    return await loop.run_in_executor(app.state.executor, validate_xbrl, body)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the validation worker pool for the app's lifetime."""
+    app.state.executor = await _start_executor()
+    app.state.executor_lock = asyncio.Lock()
+    app.state.result_cache = ResultCache()
+    try:
+        yield
+    finally:
+        app.state.executor.shutdown()
 
 
 app = FastAPI(
     title="Arelle XBRL Validation API",
     description="Validates XBRL instances against the AMSF/Strix taxonomy",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 
@@ -26,26 +115,64 @@ async def validate(request: Request):
             detail="Content-Type must be application/xml",
         )
 
-    try:
-        body = await request.body()
-        xml_content = body.decode("utf-8")
-    except UnicodeDecodeError:
+    # Refuse oversized uploads from the declared length, before reading them
+    content_length = request.headers.get("content-length")
+    if content_length is not None and not content_length.isdecimal():
         raise HTTPException(
             status_code=400,
-            detail="Invalid UTF-8 encoding in request body",
+            detail="Invalid Content-Length header",
+        )
+    if content_length is not None and int(content_length) > MAX_XBRL_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Request body exceeds {MAX_XBRL_BYTES} bytes",
         )
 
-    if not xml_content.strip():
+    # Read incrementally so chunked uploads (no Content-Length) are cut off
+    # as soon as they pass the limit. Kept as bytes: Arelle reads the
+    # encoding from the XML declaration.
+    chunks = []
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > MAX_XBRL_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Request body exceeds {MAX_XBRL_BYTES} bytes",
+            )
+        chunks.append(chunk)
+    body = b"".join(chunks)
+
+    if not body or body.isspace():
         raise HTTPException(
             status_code=400,
             detail="Empty request body",
         )
 
-    try:
-        result = validate_xbrl(xml_content)
-        return JSONResponse(content=result.to_dict())
-    except Exception as e:
+    # Reject non-XML input before paying for an Arelle run
+    if not _looks_like_xbrl(body):
         raise HTTPException(
             status_code=400,
-            detail=f"Validation failed: {str(e)}",
+            detail="Request body is not an XBRL instance document",
         )
+
+    cache = request.app.state.result_cache
+    key = cache.key(body)
+    content = cache.get(key)
+    if content is None:
+        try:
+            result = await _run_validation(request.app, body)
+        except BrokenProcessPool:
+            raise HTTPException(
+                status_code=503,
+                detail="Validation workers unavailable, retry later",
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Validation failed: {str(e)}",
+            )
+        content = result.to_dict()
+        cache.put(key, content)
+
+    return ORJSONResponse(content=content)
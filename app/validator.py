@@ -1,11 +1,17 @@
 """Arelle XBRL validation wrapper."""
 
+import atexit
+import hashlib
+import io
 import tempfile
 import os
-import xml.etree.ElementTree as ET
 from logging import LogRecord
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import IO, Any, cast
 from pathlib import Path
 from dataclasses import dataclass, field
+from lxml import etree
 from arelle.api.Session import Session
 from arelle.RuntimeOptions import RuntimeOptions
 from arelle.logging.handlers.StructuredMessageLogHandler import StructuredMessageLogHandler
@@ -21,9 +27,6 @@ class SafeStructuredMessageLogHandler(StructuredMessageLogHandler):
 
     def emit(self, logRecord: LogRecord) -> None:
         """Override emit to use our safer get_message method."""
-        from collections.abc import Mapping
-        from typing import cast, Any
-
         self.logRecordBuffer.append(logRecord)
         if not logRecord.args or len(logRecord.args) == 0:
             logRecord.args = {}
@@ -56,8 +59,41 @@ CACHE_DIR = Path(__file__).parent.parent / "cache"
 # Compiled XULE ruleset for cross-field validation
 XULE_RULESET = CACHE_DIR / "strix_2025_rules.zip"
 
-
-@dataclass
+# Stage request bodies on tmpfs when available so Arelle reads them from
+# memory rather than disk. Falls back to the platform temp directory.
+STAGING_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# Arelle log levels (lowercased) mapped to severities; any other level is info
+SEVERITY_BY_LEVEL = {
+    "error": "error",
+    "err": "error",
+    "fatal": "error",
+    "critical": "error",
+    "warning": "warning",
+    "warn": "warning",
+}
+
+# Minimal instance referencing the taxonomy, used to prime the session
+WARMUP_INSTANCE = b"""<?xml version="1.0" encoding="utf-8"?>
+<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance"
+            xmlns:link="http://www.xbrl.org/2003/linkbase"
+            xmlns:xlink="http://www.w3.org/1999/xlink">
+  <link:schemaRef xlink:type="simple"
+                  xlink:href="http://amsf.mc/fr/taxonomy/strix/2025/strix.xsd"/>
+</xbrli:xbrl>
+"""
+
+# Shared Arelle session, reused across requests. Sessions are bound to the
+# thread that created them, and Arelle attaches the log handler on the first
+# run only, so the handler lives alongside the session. So does the staging
+# file, rewritten in place for each request (Arelle requires file paths; its
+# stream input only accepts zip archives).
+_session: Session | None = None
+_log_handler: SafeStructuredMessageLogHandler | None = None
+_staging_file: IO[bytes] | None = None
+
+
+@dataclass(slots=True)
 class ValidationMessage:
     severity: str
     code: str
@@ -76,39 +112,108 @@ class ValidationMessage:
         return result
 
 
-@dataclass
+@dataclass(slots=True)
 class ValidationResult:
     valid: bool
     messages: list[ValidationMessage] = field(default_factory=list)
 
     def to_dict(self) -> dict:
-        errors = sum(1 for m in self.messages if m.severity == "error")
-        warnings = sum(1 for m in self.messages if m.severity == "warning")
-        info = sum(1 for m in self.messages if m.severity == "info")
+        # Count severities and serialize messages in a single pass
+        errors = warnings = info = 0
+        messages = []
+        for m in self.messages:
+            severity = m.severity
+            errors += severity == "error"
+            warnings += severity == "warning"
+            info += severity == "info"
+            messages.append(m.to_dict())
 
         return {
             "valid": self.valid,
             "summary": {"errors": errors, "warnings": warnings, "info": info},
-            "messages": [m.to_dict() for m in self.messages],
+            "messages": messages,
         }
 
 
-def validate_xbrl(xml_content: str) -> ValidationResult:
-    """Validate XBRL content against the bundled taxonomy."""
+class ResultCache:
+    """LRU cache of serialized validation results keyed by content digest.
+
+    Validation is a pure function of the payload, so retried or polled
+    submissions are answered without running Arelle again. Entries hold the
+    output of ValidationResult.to_dict() to skip re-serialization on hits.
+    """
+
+    def __init__(self, maxsize: int = 512) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, dict] = OrderedDict()
+
+    @staticmethod
+    def key(xml_bytes: bytes) -> bytes:
+        """Digest the payload so large bodies are not kept as cache keys."""
+        return hashlib.blake2b(xml_bytes, digest_size=16).digest()
+
+    def get(self, key: bytes) -> dict | None:
+        result = self._entries.get(key)
+        if result is not None:
+            self._entries.move_to_end(key)
+        return result
+
+    def put(self, key: bytes, result: dict) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+def open_session() -> None:
+    """Create the shared Arelle session and prime it with a warm-up run.
+
+    Must be called from the thread that will run validations. The session is
+    closed when the process exits.
+    """
+    if _session is None:
+        _create_session()
+        atexit.register(close_session)
+        validate_xbrl(WARMUP_INSTANCE)
+
+
+def close_session() -> None:
+    """Close the shared Arelle session, if open."""
+    global _session, _log_handler, _staging_file
+    if _session is not None:
+        try:
+            _session.close()
+        finally:
+            _staging_file.close()
+        _session = None
+        _log_handler = None
+        _staging_file = None
+
+
+def _create_session() -> None:
+    global _session, _log_handler, _staging_file
+    _session = Session()
+    _log_handler = SafeStructuredMessageLogHandler()
+    _staging_file = tempfile.NamedTemporaryFile(suffix=".xml", dir=STAGING_DIR)
+
+
+def validate_xbrl(xml_bytes: bytes) -> ValidationResult:
+    """Validate raw XBRL bytes against the bundled taxonomy."""
 
-    # Write XML to temp file (Arelle requires file paths)
-    with tempfile.NamedTemporaryFile(
-        mode="w", suffix=".xml", delete=False, encoding="utf-8"
-    ) as xml_file:
-        xml_file.write(xml_content)
-        xml_path = xml_file.name
+    if _session is None:
+        _create_session()
 
     try:
-        messages = _run_arelle_validation(xml_path)
-        has_errors = any(m.severity == "error" for m in messages)
-        return ValidationResult(valid=not has_errors, messages=messages)
+        _staging_file.seek(0)
+        _staging_file.write(xml_bytes)
+        _staging_file.flush()
+        messages = _run_arelle_validation(_staging_file.name)
     finally:
-        os.unlink(xml_path)
+        # Don't hold the payload in tmpfs while the worker is idle
+        _staging_file.truncate(0)
+
+    has_errors = any(m.severity == "error" for m in messages)
+    return ValidationResult(valid=not has_errors, messages=messages)
 
 
 def _run_arelle_validation(file_path: str) -> list[ValidationMessage]:
@@ -129,11 +234,13 @@ def _run_arelle_validation(file_path: str) -> list[ValidationMessage]:
         pluginOptions=plugin_options if plugin_options else None,
     )
 
-    log_handler = SafeStructuredMessageLogHandler()
-
-    with Session() as session:
-        session.run(options, logHandler=log_handler)
-        log_xml = session.get_logs("xml")
+    try:
+        _session.run(options, logHandler=_log_handler)
+        log_xml = _session.get_logs("xml")
+    finally:
+        # The handler outlives this run, so drop its buffered records
+        _log_handler.clearLogBuffer()
+        _log_handler.messages.clear()
 
     return _parse_log_xml(log_xml)
 
@@ -142,13 +249,19 @@ def _parse_log_xml(log_xml: str) -> list[ValidationMessage]:
     """Parse Arelle XML log output into ValidationMessages."""
     messages = []
 
-    if not log_xml or not log_xml.strip():
+    if not log_xml or log_xml.isspace():
         return messages
 
-    try:
-        root = ET.fromstring(log_xml)
+    # Entries are streamed, so their count is unknown up front; bind the
+    # append once instead of looking it up per entry
+    append = messages.append
 
-        for entry in root.findall("entry"):
+    try:
+        # Stream entries rather than building the whole tree; each entry is
+        # freed once converted so memory stays flat on large logs.
+        for _, entry in etree.iterparse(
+            io.BytesIO(log_xml.encode()), events=("end",), tag="entry"
+        ):
             code = entry.get("code", "unknown")
             level = entry.get("level", "info").lower()
 
@@ -156,8 +269,10 @@ def _parse_log_xml(log_xml: str) -> list[ValidationMessage]:
             message_elem = entry.find("message")
             if message_elem is not None:
                 message_text = message_elem.text or ""
-                line = _safe_int(message_elem.get("line"))
-                column = _safe_int(message_elem.get("column"))
+                line_s = message_elem.get("line")
+                line = int(line_s) if line_s and line_s.isdecimal() else None
+                column_s = message_elem.get("column")
+                column = int(column_s) if column_s and column_s.isdecimal() else None
             else:
                 message_text = entry.text or ""
                 line = None
@@ -167,10 +282,18 @@ def _parse_log_xml(log_xml: str) -> list[ValidationMessage]:
             # defeat pattern matching in _is_spurious_dimension_message.
             message_text = message_text.strip()
 
-            # Normalize severity (XULE outputs "Invalid!" messages as info)
-            severity = _normalize_severity(level, message_text)
-
-            messages.append(
+            # XULE rules output validation failures as info-level logs
+            # prefixed with "Invalid!", so promote them to errors. Spurious
+            # dimension rule messages (empty country string) stay info.
+            severity = SEVERITY_BY_LEVEL.get(level, "info")
+            if (
+                severity == "info"
+                and message_text.startswith("Invalid!")
+                and not _is_spurious_dimension_message(message_text)
+            ):
+                severity = "error"
+
+            append(
                 ValidationMessage(
                     severity=severity,
                     code=code,
@@ -179,9 +302,13 @@ def _parse_log_xml(log_xml: str) -> list[ValidationMessage]:
                     column=column,
                 )
             )
-    except ET.ParseError:
+
+            entry.clear(keep_tail=True)
+            while entry.getprevious() is not None:
+                del entry.getparent()[0]
+    except etree.XMLSyntaxError:
         # If XML parsing fails, return raw content as error
-        messages.append(
+        append(
             ValidationMessage(
                 severity="error",
                 code="arelle:logParseError",
@@ -192,16 +319,6 @@ def _parse_log_xml(log_xml: str) -> list[ValidationMessage]:
     return messages
 
 
-def _safe_int(value: str | None) -> int | None:
-    """Safely convert string to int, returning None on failure."""
-    if value is None:
-        return None
-    try:
-        return int(value)
-    except (ValueError, TypeError):
-        return None
-
-
 def _is_spurious_dimension_message(message: str) -> bool:
     """Detect false-positive XULE dimension rule messages.
 
@@ -219,23 +336,3 @@ def _is_spurious_dimension_message(message: str) -> bool:
         and message.endswith(":")
     )
 
-
-def _normalize_severity(level: str, message: str = "") -> str:
-    """Normalize log level to severity.
-
-    XULE rules output "Invalid!" messages as info-level logs,
-    so we promote them to errors based on message content.
-    Spurious dimension rule messages are kept as info.
-    """
-    level = level.lower()
-    if level in ("error", "err", "fatal", "critical"):
-        return "error"
-    if level in ("warning", "warn"):
-        return "warning"
-    # XULE rules output validation failures as info with "Invalid!" in message
-    if "Invalid!" in message:
-        # Filter out false positives from dimension rules (empty country string)
-        if _is_spurious_dimension_message(message):
-            return "info"
-        return "error"
-    return "info"